@@ -4,6 +4,9 @@ from dotenv import load_dotenv
 from config import config
 from database import init_db
 from routes import register_routes
+from database.backup import start_backup_scheduler
+from utils.profiler import init_profiler
+from utils.jobs import recover_interrupted_jobs
 
 # Load env
 load_dotenv()
@@ -16,9 +19,21 @@ app.config.from_object(config[env_name])
 # Register routes
 register_routes(app)
 
-# Auto-init DB for dev
+# Create any tables and indexes added since the database was first built
+# (idempotent), so older databases keep working on the scan path
+init_db()
+
+# Jobs from a previous process can never finish; mark them failed
+recover_interrupted_jobs()
+
+# On-demand request profiling (toggled at runtime via /admin/profile)
+init_profiler(app)
+
+# Periodic online snapshots (disabled when BACKUP_INTERVAL_SECONDS is 0).
+# With the debug reloader only the serving child process (WERKZEUG_RUN_MAIN)
+# runs the scheduler, so the watcher parent does not take duplicate snapshots.
+if not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    start_backup_scheduler()
+
 if __name__ == '__main__':
-    if env_name == 'development':
-        print("🔧 Auto-initializing database...")
-        init_db()
     app.run(host='127.0.0.1', port=5000, debug=app.config['DEBUG'])
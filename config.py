@@ -30,6 +30,26 @@ class Config:
     QR_CODE_BORDER = int(os.getenv('QR_CODE_BORDER', 4))
     QR_CODE_FILL_COLOR = os.getenv('QR_CODE_FILL_COLOR', 'black')
     QR_CODE_BACK_COLOR = os.getenv('QR_CODE_BACK_COLOR', 'white')
+    QR_CODE_FORMAT = os.getenv('QR_CODE_FORMAT', 'png')  # PNG renderer: png or pil
+
+    # Kiosk scanner settings
+    SCANNER_CONTINUOUS = os.getenv('SCANNER_CONTINUOUS', 'True').lower() == 'true'
+    SCANNER_FPS = int(os.getenv('SCANNER_FPS', 15))
+    SCANNER_QRBOX = int(os.getenv('SCANNER_QRBOX', 250))
+    SCANNER_DEDUPE_MS = int(os.getenv('SCANNER_DEDUPE_MS', 5000))
+
+    # Backup settings (interval of 0 disables the background scheduler)
+    BACKUP_DIR = os.getenv('BACKUP_DIR', 'backups')
+    BACKUP_INTERVAL_SECONDS = int(os.getenv('BACKUP_INTERVAL_SECONDS', 0))
+    BACKUP_RETENTION = int(os.getenv('BACKUP_RETENTION', 24))
+    BACKUP_PAGES_PER_STEP = int(os.getenv('BACKUP_PAGES_PER_STEP', 64))
+
+    # Background job settings
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+    EXPORT_DIR = os.getenv('EXPORT_DIR', 'exports')  # One CSV per export job
+
+    # Change feed settings (max changes per /admin/changes response)
+    CHANGE_FEED_LIMIT = int(os.getenv('CHANGE_FEED_LIMIT', 10000))
 
     # Pagination settings
     DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', 50))
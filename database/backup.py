@@ -0,0 +1,137 @@
+"""
+Online database snapshots using the SQLite backup API
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from config import Config
+
+_snapshot_lock = threading.Lock()
+_scheduler_thread = None
+_scheduler_stop = threading.Event()
+
+
+def _db_stem():
+    return os.path.splitext(os.path.basename(Config.DB_NAME))[0]
+
+
+def list_snapshots():
+    """
+    List completed snapshot files of the current database, oldest first.
+
+    Only names of the exact form <stem>-<YYYYmmddTHHMMSSffffff>Z.db match,
+    so snapshots of other databases sharing the prefix (e.g. iot2025 vs
+    iot2025-dev) are never listed or pruned.
+    """
+    if not os.path.isdir(Config.BACKUP_DIR):
+        return []
+
+    pattern = re.compile(rf"^{re.escape(_db_stem())}-\d{{8}}T\d{{12}}Z\.db$")
+    return sorted(
+        os.path.join(Config.BACKUP_DIR, name)
+        for name in os.listdir(Config.BACKUP_DIR)
+        if pattern.match(name)
+    )
+
+
+def create_snapshot() -> str:
+    """
+    Copy the live database into a timestamped snapshot file.
+
+    The copy runs in steps of Config.BACKUP_PAGES_PER_STEP pages so the
+    source database is only locked briefly per step and kiosk writes can
+    interleave with the backup.
+
+    Returns:
+        str: Path to the completed snapshot file.
+    """
+    os.makedirs(Config.BACKUP_DIR, exist_ok=True)
+
+    with _snapshot_lock:
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+        snapshot_path = os.path.join(Config.BACKUP_DIR, f"{_db_stem()}-{stamp}.db")
+        partial_path = f"{snapshot_path}.part"
+
+        try:
+            src = sqlite3.connect(Config.DB_NAME)
+            try:
+                dst = sqlite3.connect(partial_path)
+                try:
+                    src.backup(dst, pages=Config.BACKUP_PAGES_PER_STEP, sleep=0.01)
+                finally:
+                    dst.close()
+            finally:
+                src.close()
+
+            # Only expose the snapshot once it is complete
+            os.replace(partial_path, snapshot_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+        prune_snapshots(keep=snapshot_path)
+
+    return snapshot_path
+
+
+def prune_snapshots(retention: int = None, keep: str = None) -> int:
+    """
+    Delete the oldest snapshots beyond the retention count (at least 1).
+
+    :param retention: Number of snapshots to keep; defaults to Config.BACKUP_RETENTION
+    :param keep: Snapshot path that is never deleted, e.g. the one just taken
+    :return: Number of snapshots deleted
+    """
+    retention = max(1, Config.BACKUP_RETENTION if retention is None else retention)
+    snapshots = [path for path in list_snapshots() if path != keep]
+    if keep:
+        retention -= 1
+
+    expired = snapshots[:len(snapshots) - retention] if len(snapshots) > retention else []
+
+    for path in expired:
+        os.remove(path)
+
+    return len(expired)
+
+
+def _run_scheduler(interval):
+    while not _scheduler_stop.wait(interval):
+        # Keep the scheduler alive through any failure (locked DB, disk full, ...)
+        try:
+            create_snapshot()
+        except Exception as e:
+            print(f"⚠️ Scheduled backup failed: {e}")
+
+
+def start_backup_scheduler(interval: int = None) -> bool:
+    """
+    Start the background snapshot thread if it is enabled and not running.
+
+    Returns:
+        bool: True if a scheduler thread is running after the call.
+    """
+    global _scheduler_thread
+
+    interval = Config.BACKUP_INTERVAL_SECONDS if interval is None else interval
+    if interval <= 0:
+        return False
+
+    if _scheduler_thread and _scheduler_thread.is_alive():
+        return True
+
+    _scheduler_stop.clear()
+    _scheduler_thread = threading.Thread(
+        target=_run_scheduler, args=(interval,), name='db-backup', daemon=True)
+    _scheduler_thread.start()
+    return True
+
+
+def stop_backup_scheduler():
+    """
+    Signal the background snapshot thread to exit.
+    """
+    _scheduler_stop.set()
@@ -4,6 +4,7 @@ Database connection and initialization utilities
 
 import sqlite3
 from contextlib import contextmanager
+from datetime import datetime, timezone
 from config import Config
 
 
@@ -33,11 +34,160 @@ def get_db_cursor():
         conn.close()
 
 
-def init_db():
+#
+#   QUERIES
+#
+#   Every statement the routes and helpers run at request time. They are
+#   shared constants so the query-plan tests explain exactly this SQL.
+#
+
+# Stats
+SQL_COUNT_TEAMS = 'SELECT COUNT(*) AS count FROM teams'
+SQL_COUNT_VISITOR_VISITS = 'SELECT COUNT(*) AS count FROM visitor_visits'
+SQL_COUNT_VISITORS = 'SELECT COUNT(*) AS count FROM visitors'
+SQL_COUNT_QR_CODES = 'SELECT COUNT(*) AS count FROM qr_codes'
+
+# Teams
+SQL_GET_TEAM_BY_ID = 'SELECT * FROM teams WHERE id = ?'
+SQL_GET_TEAM_NAME_BY_ID = 'SELECT team_name FROM teams WHERE id = ?'
+SQL_TEAM_NAME_EXISTS = 'SELECT 1 FROM teams WHERE team_name = ?'
+SQL_INSERT_TEAM = '''
+    INSERT INTO teams (id, team_name, project_title, description, members, supervisor)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+SQL_LIST_TEAMS = 'SELECT id, team_name FROM teams'
+
+# Visitors and visits
+SQL_GET_VISITOR_BY_QR = 'SELECT * FROM visitors WHERE visitor_qr = ?'
+SQL_GET_VISITOR_VISIT_LOG = '''
+    SELECT team_name, visit_time
+    FROM visitor_visits
+    WHERE visitor_qr = ?
+    ORDER BY visit_time DESC
+'''
+SQL_VISIT_EXISTS = '''
+    SELECT 1 FROM visitor_visits
+    WHERE visitor_qr = ? AND team_name = ?
+'''
+SQL_INSERT_VISIT = '''
+    INSERT INTO visitor_visits (visitor_qr, team_name, visit_time)
+    VALUES (?, ?, ?)
+'''
+SQL_UPDATE_VISITOR_VISITS = '''
+    UPDATE visitors
+    SET total_visits = ?, last_visit = ?
+    WHERE visitor_qr = ?
+'''
+SQL_INSERT_VISITOR = '''
+    INSERT INTO visitors (visitor_qr, first_visit, last_visit, total_visits)
+    VALUES (?, ?, ?, ?)
+'''
+
+# QR codes
+SQL_CHECK_QR_CODE_EXISTS = '''
+    SELECT 1
+    FROM qr_codes
+    WHERE qr_code = ? AND deleted_time IS NULL
+    LIMIT 1
+'''
+SQL_INSERT_QR_CODE = '''
+    INSERT INTO qr_codes (qr_code, qr_image_base64)
+    VALUES (?, ?)
+'''
+SQL_SOFT_DELETE_QR_CODES = '''
+    UPDATE qr_codes
+    SET 
+        qr_code = 'DEL_' || qr_code,
+        deleted_time = ?
+    WHERE deleted_time IS NULL
+'''
+SQL_LIST_ACTIVE_QR_CODES = '''
+    SELECT qr_code, qr_image_base64, generated_time, is_printed, is_distributed, notes
+    FROM qr_codes
+    WHERE deleted_time IS NULL
+    ORDER BY id
+'''
+
+# Visit rollups
+SQL_GET_ROLLUP_STATE = "SELECT last_visit_id FROM rollup_state WHERE name = 'team_visit_rollups'"
+SQL_PENDING_ROLLUP_VISITS = '''
+    SELECT COUNT(*) AS count, MAX(id) AS max_id
+    FROM visitor_visits
+    WHERE id > ?
+'''
+SQL_FOLD_VISIT_ROLLUPS = '''
+    INSERT INTO team_visit_rollups (granularity, bucket_start, team_name, visit_count)
+    SELECT ?, strftime(?, visit_time), team_name, COUNT(*)
+    FROM visitor_visits
+    WHERE id > ? AND id <= ?
+    GROUP BY 2, 3
+    ON CONFLICT (granularity, bucket_start, team_name)
+    DO UPDATE SET visit_count = visit_count + excluded.visit_count
+'''
+SQL_SET_ROLLUP_STATE = '''
+    INSERT INTO rollup_state (name, last_visit_id)
+    VALUES ('team_visit_rollups', ?)
+    ON CONFLICT (name) DO UPDATE SET last_visit_id = excluded.last_visit_id
+'''
+SQL_GET_TEAM_TRAFFIC = '''
+    SELECT bucket_start, team_name, visit_count
+    FROM team_visit_rollups
+    WHERE granularity = ? AND bucket_start >= ? AND bucket_start < ?
+    ORDER BY bucket_start
+'''
+
+# Jobs
+SQL_INSERT_JOB = '''
+    INSERT INTO jobs (id, kind, status, created_time)
+    VALUES (?, ?, 'queued', ?)
+'''
+SQL_START_JOB = '''
+    UPDATE jobs
+    SET status = 'running', started_time = ?
+    WHERE id = ?
+'''
+SQL_FINISH_JOB = '''
+    UPDATE jobs
+    SET status = ?, progress = ?, total = ?, result = ?, error = ?, finished_time = ?
+    WHERE id = ?
+'''
+SQL_GET_JOB = 'SELECT * FROM jobs WHERE id = ?'
+SQL_FAIL_INTERRUPTED_JOBS = '''
+    UPDATE jobs
+    SET status = 'failed', error = 'Interrupted by server restart', finished_time = ?
+    WHERE status IN ('queued', 'running')
+'''
+
+# Change feed
+SQL_GET_CHANGE_FEED_END = '''
+    SELECT MAX(seq) AS end_seq FROM (
+        SELECT seq FROM change_log
+        WHERE seq > ?
+        ORDER BY seq
+        LIMIT ?
+    )
+'''
+SQL_LIST_CHANGES = '''
+    SELECT c.seq, c.entity, c.visitor_qr,
+           v.id AS visit_id, v.team_name, v.visit_time,
+           s.first_visit, s.last_visit, s.total_visits,
+           s.sticker_dispensed, s.sticker_dispensed_time, s.is_active
+    FROM change_log c
+    LEFT JOIN visitor_visits v
+        ON c.entity = 'visit' AND v.id = c.visit_id
+    LEFT JOIN visitors s
+        ON c.entity = 'visitor' AND s.visitor_qr = c.visitor_qr
+    WHERE c.seq > ? AND c.seq <= ?
+    ORDER BY c.seq
+    LIMIT ?
+'''
+
+
+def init_db(db_name=None):
     """
     Initialize the database with required tables
     """
-    with sqlite3.connect(Config.DB_NAME) as conn:
+    with sqlite3.connect(db_name or Config.DB_NAME) as conn:
         # Create teams table
         conn.execute('''
             CREATE TABLE IF NOT EXISTS teams (
@@ -92,9 +242,11 @@ def init_db():
         ''')
 
         # Indexes
+        # Covers get_visitor_visit_log: filter by visitor, ordered by time
+        conn.execute('DROP INDEX IF EXISTS idx_visitor_visits_visitor_qr')
         conn.execute('''
-            CREATE INDEX IF NOT EXISTS idx_visitor_visits_visitor_qr 
-            ON visitor_visits(visitor_qr)
+            CREATE INDEX IF NOT EXISTS idx_visitor_visits_visitor_qr_time
+            ON visitor_visits(visitor_qr, visit_time, team_name)
         ''')
 
         conn.execute('''
@@ -112,22 +264,130 @@ def init_db():
             ON visitors(sticker_dispensed)
         ''')
 
+        # Partial index over active QR codes (export and soft-delete reset)
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_qr_codes_active
+            ON qr_codes(id) WHERE deleted_time IS NULL
+        ''')
+
+        # Create team_visit_rollups table (visits per team per time bucket)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS team_visit_rollups (
+                granularity TEXT NOT NULL,            -- 'minute' or 'hour'
+                bucket_start TEXT NOT NULL,           -- ISO bucket start (UTC)
+                team_name TEXT NOT NULL,
+                visit_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (granularity, bucket_start, team_name)
+            )
+        ''')
+
+        # Create rollup_state table (last visitor_visits id folded into rollups)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS rollup_state (
+                name TEXT PRIMARY KEY,
+                last_visit_id INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+        conn.execute('''
+            INSERT OR IGNORE INTO rollup_state (name, last_visit_id)
+            VALUES ('team_visit_rollups', 0)
+        ''')
+
+        # Create jobs table (background admin operations)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,                  -- UUID
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,                 -- queued, running, succeeded, failed, cancelled
+                progress INTEGER DEFAULT 0,
+                total INTEGER,
+                result TEXT,                          -- JSON
+                error TEXT,
+                created_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_time TIMESTAMP,
+                finished_time TIMESTAMP
+            )
+        ''')
+
+        # Create change_log table (monotonic feed of visit and visitor changes)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS change_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                entity TEXT NOT NULL,                 -- 'visit', 'visitor' or 'reset'
+                visit_id INTEGER,
+                visitor_qr TEXT NOT NULL
+            )
+        ''')
+
+        # Backfill rows written before change_log existed
+        if conn.execute('SELECT 1 FROM change_log LIMIT 1').fetchone() is None:
+            conn.execute('''
+                INSERT INTO change_log (entity, visit_id, visitor_qr)
+                SELECT 'visit', id, visitor_qr FROM visitor_visits ORDER BY id
+            ''')
+
+            conn.execute('''
+                INSERT INTO change_log (entity, visitor_qr)
+                SELECT 'visitor', visitor_qr FROM visitors
+            ''')
+
+        # Record every write to visitor_visits and visitors in change_log
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_visitor_visits_insert_change
+            AFTER INSERT ON visitor_visits
+            BEGIN
+                INSERT INTO change_log (entity, visit_id, visitor_qr)
+                VALUES ('visit', NEW.id, NEW.visitor_qr);
+            END
+        ''')
+
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_visitors_insert_change
+            AFTER INSERT ON visitors
+            BEGIN
+                INSERT INTO change_log (entity, visitor_qr)
+                VALUES ('visitor', NEW.visitor_qr);
+            END
+        ''')
+
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_visitors_update_change
+            AFTER UPDATE ON visitors
+            BEGIN
+                INSERT INTO change_log (entity, visitor_qr)
+                VALUES ('visitor', NEW.visitor_qr);
+            END
+        ''')
+
         conn.commit()
 
 
 def reset_db():
     """
     Drop all tables and recreate them (use with caution)
+
+    change_log is emptied instead of dropped so its AUTOINCREMENT sequence
+    keeps growing and existing feed cursors stay valid. A single 'reset'
+    entry tells feed consumers to discard what they have mirrored.
     """
     with sqlite3.connect(Config.DB_NAME) as conn:
         conn.execute('DROP TABLE IF EXISTS visitor_visits')
         conn.execute('DROP TABLE IF EXISTS visitors')
         conn.execute('DROP TABLE IF EXISTS qr_codes')
         conn.execute('DROP TABLE IF EXISTS teams')
+        conn.execute('DROP TABLE IF EXISTS team_visit_rollups')
+        conn.execute('DROP TABLE IF EXISTS rollup_state')
+        conn.execute('DROP TABLE IF EXISTS jobs')
         conn.commit()
 
     init_db()
 
+    with sqlite3.connect(Config.DB_NAME) as conn:
+        conn.execute('DELETE FROM change_log')
+        conn.execute("INSERT INTO change_log (entity, visitor_qr) VALUES ('reset', '')")
+        conn.commit()
+
 
 def get_db_stats():
     """
@@ -137,16 +397,16 @@ def get_db_stats():
         cursor = conn.cursor()
 
         # Get table counts
-        cursor.execute("SELECT COUNT(*) as count FROM teams")
+        cursor.execute(SQL_COUNT_TEAMS)
         teams_count = cursor.fetchone()['count']
 
-        cursor.execute("SELECT COUNT(*) as count FROM visitor_visits")
+        cursor.execute(SQL_COUNT_VISITOR_VISITS)
         visits_count = cursor.fetchone()['count']
 
-        cursor.execute("SELECT COUNT(*) as count FROM visitors")
+        cursor.execute(SQL_COUNT_VISITORS)
         visitors_count = cursor.fetchone()['count']
 
-        cursor.execute("SELECT COUNT(*) as count FROM qr_codes")
+        cursor.execute(SQL_COUNT_QR_CODES)
         qr_codes_count = cursor.fetchone()['count']
 
         return {
@@ -159,24 +419,142 @@ def get_db_stats():
 
 def get_team_by_id(team_id: str):
     with get_db_cursor() as cursor:
-        cursor.execute("SELECT * FROM teams WHERE id = ?", (team_id,))
+        cursor.execute(SQL_GET_TEAM_BY_ID, (team_id,))
         row = cursor.fetchone()
         return dict(row) if row else None
 
 
 def get_visitor_by_qr(qr_code: str):
     with get_db_cursor() as cursor:
-        cursor.execute(
-            'SELECT * FROM visitors WHERE visitor_qr = ?', (qr_code,))
+        cursor.execute(SQL_GET_VISITOR_BY_QR, (qr_code,))
         return cursor.fetchone()
 
 
 def get_visitor_visit_log(qr_code: str):
     with get_db_cursor() as cursor:
-        cursor.execute('''
-            SELECT team_name, visit_time
-            FROM visitor_visits
-            WHERE visitor_qr = ?
-            ORDER BY visit_time DESC
-        ''', (qr_code,))
+        cursor.execute(SQL_GET_VISITOR_VISIT_LOG, (qr_code,))
         return cursor.fetchall()
+
+
+# strftime formats used to truncate visit_time to the start of a bucket
+ROLLUP_GRANULARITIES = {
+    'minute': '%Y-%m-%dT%H:%M:00',
+    'hour': '%Y-%m-%dT%H:00:00',
+}
+
+
+def refresh_visit_rollups(cursor) -> int:
+    """
+    Fold visitor_visits rows newer than the last processed id into
+    team_visit_rollups. Runs on the caller's cursor so it can share the
+    transaction of the write that produced the visits.
+
+    Without such a transaction (the reader catch-up path) it takes the
+    write lock first, so no visit can commit between reading
+    last_visit_id and folding and the same visits are never folded twice.
+
+    Returns:
+        int: Number of visits folded into the rollups.
+    """
+    if not cursor.connection.in_transaction:
+        cursor.execute('BEGIN IMMEDIATE')
+
+    cursor.execute(SQL_GET_ROLLUP_STATE)
+    row = cursor.fetchone()
+    last_id = row['last_visit_id'] if row else 0
+
+    cursor.execute(SQL_PENDING_ROLLUP_VISITS, (last_id,))
+    pending = cursor.fetchone()
+    if not pending['count']:
+        return 0
+
+    for granularity, fmt in ROLLUP_GRANULARITIES.items():
+        cursor.execute(SQL_FOLD_VISIT_ROLLUPS,
+                       (granularity, fmt, last_id, pending['max_id']))
+
+    cursor.execute(SQL_SET_ROLLUP_STATE, (pending['max_id'],))
+
+    return pending['count']
+
+
+def _traffic_bound(name: str, value: str):
+    """
+    Parse an ISO 8601 traffic bound and normalize it to the bucket_start
+    format ('YYYY-MM-DDTHH:MM:SS', naive UTC) so string comparison is exact.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 timestamp, got {value!r}") from None
+
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def get_team_traffic(granularity: str = 'hour', since: str = None, until: str = None):
+    """
+    Read per-team visit counts from the rollups, catching up on any
+    visits that have not been folded in yet.
+
+    Args:
+        granularity (str): 'minute' or 'hour'.
+        since (str): Inclusive ISO 8601 lower bound on bucket_start.
+        until (str): Exclusive ISO 8601 upper bound on bucket_start.
+            Timestamps with an offset are converted to UTC.
+
+    Returns:
+        list: Rows of (bucket_start, team_name, visit_count) ordered by bucket.
+
+    Raises:
+        ValueError: On an unknown granularity or a bound that is not ISO 8601.
+    """
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+
+    # Open bounds: '' sorts before and '~' after every ISO timestamp
+    since = _traffic_bound('since', since) if since else ''
+    until = _traffic_bound('until', until) if until else '~'
+    params = (granularity, since, until)
+
+    with get_db_cursor() as cursor:
+        refresh_visit_rollups(cursor)
+        cursor.execute(SQL_GET_TEAM_TRAFFIC, params)
+        return cursor.fetchall()
+
+
+def get_change_feed_end(after: int, limit: int) -> int:
+    """
+    Find the last change_log sequence a feed request starting after
+    `after` will return, capped at `limit` changes.
+
+    Returns:
+        int: The end sequence, or `after` if there are no new changes.
+    """
+    with get_db_cursor() as cursor:
+        cursor.execute(SQL_GET_CHANGE_FEED_END, (after, limit))
+        row = cursor.fetchone()
+        return row['end_seq'] if row['end_seq'] is not None else after
+
+
+def iter_changes(after: int, end: int, batch_size: int = 500):
+    """
+    Yield change_log entries in (after, end] joined with the changed row.
+    Reads in short batches so no transaction stays open while the caller
+    streams results.
+
+    Visit changes carry the inserted visit; visitor changes carry the
+    visitor's current state.
+    """
+    while after < end:
+        with get_db_cursor() as cursor:
+            cursor.execute(SQL_LIST_CHANGES, (after, end, batch_size))
+            rows = cursor.fetchall()
+
+        if not rows:
+            return
+
+        for row in rows:
+            yield row
+
+        after = rows[-1]['seq']
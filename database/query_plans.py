@@ -0,0 +1,134 @@
+"""
+Query-plan guard for the queries used by routes and helpers
+
+Runs EXPLAIN QUERY PLAN for the shared SQL_* statements in
+database/database.py against a freshly initialized schema and reports
+full scans and temp B-tree sorts. tests/test_query_plans.py fails on
+any problem found here.
+"""
+
+import os
+import sqlite3
+import tempfile
+from . import database
+from .database import init_db
+
+# (name, sql, allow_full_scan)
+HOT_QUERIES = [
+    # Stats are whole-table counts by design
+    ('SQL_COUNT_TEAMS', database.SQL_COUNT_TEAMS, True),
+    ('SQL_COUNT_VISITOR_VISITS', database.SQL_COUNT_VISITOR_VISITS, True),
+    ('SQL_COUNT_VISITORS', database.SQL_COUNT_VISITORS, True),
+    ('SQL_COUNT_QR_CODES', database.SQL_COUNT_QR_CODES, True),
+
+    ('SQL_GET_TEAM_BY_ID', database.SQL_GET_TEAM_BY_ID, False),
+    ('SQL_GET_TEAM_NAME_BY_ID', database.SQL_GET_TEAM_NAME_BY_ID, False),
+    ('SQL_TEAM_NAME_EXISTS', database.SQL_TEAM_NAME_EXISTS, False),
+    ('SQL_INSERT_TEAM', database.SQL_INSERT_TEAM, False),
+    # Lists every team for the scanner URLs by design
+    ('SQL_LIST_TEAMS', database.SQL_LIST_TEAMS, True),
+
+    ('SQL_GET_VISITOR_BY_QR', database.SQL_GET_VISITOR_BY_QR, False),
+    ('SQL_GET_VISITOR_VISIT_LOG', database.SQL_GET_VISITOR_VISIT_LOG, False),
+    ('SQL_VISIT_EXISTS', database.SQL_VISIT_EXISTS, False),
+    ('SQL_INSERT_VISIT', database.SQL_INSERT_VISIT, False),
+    ('SQL_UPDATE_VISITOR_VISITS', database.SQL_UPDATE_VISITOR_VISITS, False),
+    ('SQL_INSERT_VISITOR', database.SQL_INSERT_VISITOR, False),
+
+    ('SQL_CHECK_QR_CODE_EXISTS', database.SQL_CHECK_QR_CODE_EXISTS, False),
+    ('SQL_INSERT_QR_CODE', database.SQL_INSERT_QR_CODE, False),
+    ('SQL_SOFT_DELETE_QR_CODES', database.SQL_SOFT_DELETE_QR_CODES, False),
+    ('SQL_LIST_ACTIVE_QR_CODES', database.SQL_LIST_ACTIVE_QR_CODES, False),
+
+    ('SQL_GET_ROLLUP_STATE', database.SQL_GET_ROLLUP_STATE, False),
+    ('SQL_PENDING_ROLLUP_VISITS', database.SQL_PENDING_ROLLUP_VISITS, False),
+    ('SQL_FOLD_VISIT_ROLLUPS', database.SQL_FOLD_VISIT_ROLLUPS, False),
+    ('SQL_SET_ROLLUP_STATE', database.SQL_SET_ROLLUP_STATE, False),
+    ('SQL_GET_TEAM_TRAFFIC', database.SQL_GET_TEAM_TRAFFIC, False),
+
+    ('SQL_INSERT_JOB', database.SQL_INSERT_JOB, False),
+    ('SQL_START_JOB', database.SQL_START_JOB, False),
+    ('SQL_FINISH_JOB', database.SQL_FINISH_JOB, False),
+    ('SQL_GET_JOB', database.SQL_GET_JOB, False),
+    # Runs once at startup over the small jobs table
+    ('SQL_FAIL_INTERRUPTED_JOBS', database.SQL_FAIL_INTERRUPTED_JOBS, True),
+
+    ('SQL_GET_CHANGE_FEED_END', database.SQL_GET_CHANGE_FEED_END, False),
+    ('SQL_LIST_CHANGES', database.SQL_LIST_CHANGES, False),
+]
+
+
+def shared_query_names():
+    """
+    Names of every SQL_* constant defined in database/database.py.
+    """
+    return {name for name in vars(database) if name.startswith('SQL_')}
+
+
+def partial_indexes(conn):
+    """
+    Names of all partial indexes (CREATE INDEX ... WHERE) in the schema.
+    """
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'")]
+    return {
+        index[1]
+        for table in tables
+        for index in conn.execute(f"PRAGMA index_list('{table}')")
+        if index[4]
+    }
+
+
+def explain(conn, sql):
+    """
+    Return the EXPLAIN QUERY PLAN detail lines for a query, binding NULL
+    to every placeholder.
+    """
+    params = [None] * sql.count('?')
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def plan_violations(detail, partial=(), allow_full_scan=False):
+    """
+    List the problems in one query plan:
+    - full scans: any SCAN of a table or of a full index (including
+      USING COVERING INDEX), unless the index is partial and so only
+      holds the rows the query wants
+    - temp B-trees used for ORDER BY
+    """
+    problems = []
+    for line in detail:
+        if line.startswith('SCAN ') and not allow_full_scan:
+            index_name = line.split(' INDEX ', 1)[1].split()[0] if ' INDEX ' in line else None
+            if index_name not in partial:
+                problems.append(f"full scan: {line}")
+        if 'TEMP B-TREE' in line and 'ORDER BY' in line:
+            problems.append(f"temp sort: {line}")
+    return problems
+
+
+def check_query_plans(queries=None):
+    """
+    Explain every hot query against a fresh schema.
+
+    Returns:
+        dict: Query name -> list of problems, only for queries that have any.
+    """
+    queries = HOT_QUERIES if queries is None else queries
+    failures = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'query_plans.db')
+        init_db(db_path)
+
+        conn = sqlite3.connect(db_path)
+        try:
+            partial = partial_indexes(conn)
+            for name, sql, allow_full_scan in queries:
+                problems = plan_violations(explain(conn, sql), partial, allow_full_scan)
+                if problems:
+                    failures[name] = problems
+        finally:
+            conn.close()
+
+    return failures
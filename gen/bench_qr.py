@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+import base64
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.qr_generator import QRGenerator  # noqa: E402
+
+
+def benchmark_qr_formats(count=500, formats=('pil', 'png', 'svg')):
+    """
+    Compare QR renderers by codes generated per second and bytes per code.
+
+    Args:
+        count (int): Number of QR codes to generate per format.
+        formats (tuple): PNG renderers accepted by QRGenerator.generate_qr_base64,
+            or 'svg' for QRGenerator.generate_qr_svg.
+
+    Returns:
+        None
+    """
+    print(f"{'format':<8}{'codes/s':>12}{'bytes/code':>14}")
+
+    for image_format in formats:
+        total_bytes = 0
+        start = time.perf_counter()
+        for i in range(count):
+            if image_format == 'svg':
+                total_bytes += len(QRGenerator.generate_qr_svg(f"QR_{i + 1:04}"))
+            else:
+                encoded = QRGenerator.generate_qr_base64(f"QR_{i + 1:04}", image_format)
+                total_bytes += len(base64.b64decode(encoded))
+        elapsed = time.perf_counter() - start
+
+        print(f"{image_format:<8}{count / elapsed:>12.1f}{total_bytes / count:>14.1f}")
+
+
+if __name__ == '__main__':
+    benchmark_qr_formats(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -1,10 +1,19 @@
 from database import get_db_cursor
 import uuid
 import csv
-from flask import Blueprint, request, jsonify, abort, send_file, url_for, render_template
+import json
+from flask import (Blueprint, Response, stream_with_context, request, jsonify, abort, send_file, url_for,
+                   render_template, current_app)
 from database import init_db, reset_db, get_db_stats
-from utils.helpers import init_teams_from_csv
+from database.database import get_team_traffic, get_change_feed_end, iter_changes, SQL_LIST_TEAMS
+from database.backup import create_snapshot
+from utils.helpers import init_teams_from_csv, check_qr_code_exists
 from utils.qr_generator import QRGenerator
+from config import Config
+from utils.jobs import submit_job, get_job, cancel_job, run_without_jobs, JobConflict
+from utils.profiler import (enable_profiling, disable_profiling, profiling_status,
+                            get_pstats_text, get_pstats_dump, get_collapsed_stacks,
+                            SORT_KEYS, MAX_INTERVAL_MS)
 import os
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
@@ -16,6 +25,23 @@ def is_authorized():
     return token == f"Bearer {ADMIN_TOKEN}"
 
 
+def export_csv_path(job_id):
+    return os.path.join(Config.EXPORT_DIR, f"active_qr_codes-{job_id}.csv")
+
+
+def start_job(kind, func, *args, conflicts=(), job_id=None):
+    try:
+        job_id = submit_job(kind, func, *args, conflicts=conflicts, job_id=job_id)
+    except JobConflict as e:
+        return jsonify({"error": str(e), "job_id": e.job_id}), 409
+
+    return jsonify({
+        "message": f"{kind} job queued.",
+        "job_id": job_id,
+        "status_url": url_for("admin.admin_job", job_id=job_id)
+    }), 202
+
+
 #
 #   DB
 #
@@ -39,10 +65,112 @@ def admin_init_db():
 def admin_reset_db():
     if not is_authorized():
         abort(403)
-    reset_db()
+
+    # Dropping tables under a running job would corrupt its work and its jobs row
+    try:
+        run_without_jobs(reset_db)
+    except JobConflict as e:
+        return jsonify({"error": str(e), "job_id": e.job_id}), 409
+
     return jsonify({"message": "Database reset and reinitialized."})
 
 
+@admin_bp.route('/backup', methods=['POST'])
+def admin_backup():
+    if not is_authorized():
+        abort(403)
+    snapshot_path = create_snapshot()
+    return send_file(os.path.abspath(snapshot_path), mimetype='application/vnd.sqlite3',
+                     as_attachment=True, download_name=os.path.basename(snapshot_path))
+
+
+@admin_bp.route('/traffic', methods=['GET'])
+def admin_traffic():
+    if not is_authorized():
+        abort(403)
+
+    granularity = request.args.get('granularity', 'hour')
+    since = request.args.get('since')
+    until = request.args.get('until')
+
+    try:
+        rows = get_team_traffic(granularity, since, until)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    buckets = sorted({row["bucket_start"] for row in rows})
+    bucket_index = {bucket: i for i, bucket in enumerate(buckets)}
+    teams = sorted({row["team_name"] for row in rows})
+
+    # heatmap[team][bucket] plus a per-bucket total series
+    heatmap = {team: [0] * len(buckets) for team in teams}
+    totals = [0] * len(buckets)
+    for row in rows:
+        i = bucket_index[row["bucket_start"]]
+        heatmap[row["team_name"]][i] = row["visit_count"]
+        totals[i] += row["visit_count"]
+
+    return jsonify({
+        "granularity": granularity,
+        "buckets": buckets,
+        "teams": teams,
+        "heatmap": heatmap,
+        "series": [
+            {"bucket_start": bucket, "visits": total}
+            for bucket, total in zip(buckets, totals)
+        ]
+    })
+
+
+@admin_bp.route('/changes', methods=['GET'])
+def admin_changes():
+    if not is_authorized():
+        abort(403)
+
+    try:
+        after = int(request.args.get('after', 0))
+        limit = min(int(request.args.get('limit', Config.CHANGE_FEED_LIMIT)),
+                    Config.CHANGE_FEED_LIMIT)
+    except ValueError:
+        return jsonify({"error": "after and limit must be integers"}), 400
+
+    if after < 0 or limit <= 0:
+        return jsonify({"error": "after must be >= 0 and limit positive"}), 400
+
+    # Fix the end of this response up front so the resume token can be sent as a header
+    end = get_change_feed_end(after, limit)
+    has_more = end > after and get_change_feed_end(end, 1) > end
+
+    def generate():
+        for row in iter_changes(after, end):
+            if row["entity"] == "visit":
+                change = {
+                    "id": row["visit_id"],
+                    "visitor_qr": row["visitor_qr"],
+                    "team_name": row["team_name"],
+                    "visit_time": row["visit_time"]
+                }
+            elif row["entity"] == "reset":
+                # The database was reset; everything before this seq is gone
+                change = {}
+            else:
+                change = {
+                    "visitor_qr": row["visitor_qr"],
+                    "first_visit": row["first_visit"],
+                    "last_visit": row["last_visit"],
+                    "total_visits": row["total_visits"],
+                    "sticker_dispensed": bool(row["sticker_dispensed"]),
+                    "sticker_dispensed_time": row["sticker_dispensed_time"],
+                    "is_active": bool(row["is_active"])
+                }
+            yield json.dumps({"seq": row["seq"], "type": row["entity"], "data": change}) + "\n"
+
+        yield json.dumps({"type": "cursor", "cursor": end, "has_more": has_more}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={"X-Resume-Cursor": str(end)})
+
+
 #
 #   QR
 #
@@ -51,24 +179,118 @@ def admin_reset_db():
 def admin_init_qr_codes():
     if not is_authorized():
         abort(403)
-    QRGenerator.init_qr_codes()
-    return jsonify({"message": "QR codes initialized."})
+    return start_job('init-qr-codes', QRGenerator.init_qr_codes, conflicts=('qr_codes',))
 
 
 @admin_bp.route('/reset-qr-codes', methods=['POST'])
 def admin_reset_qr_codes():
     if not is_authorized():
         abort(403)
-    QRGenerator.reset_qr_codes()
-    return jsonify({"message": "QR codes reset."})
+    return start_job('reset-qr-codes', QRGenerator.reset_qr_codes, conflicts=('qr_codes',))
 
 
 @admin_bp.route('/download-active-qr-codes', methods=['GET'])
 def download_active_qr_codes():
     if not is_authorized():
         abort(403)
-    file_path = QRGenerator.export_active_qr_codes_to_csv()
-    return send_file(file_path, mimetype='text/csv', as_attachment=True, download_name='active_qr_codes.csv')
+    # Each export job writes its own file so /jobs/<id>/download serves that job's output
+    job_id = str(uuid.uuid4())
+    return start_job('download-active-qr-codes', QRGenerator.export_active_qr_codes_to_csv,
+                     export_csv_path(job_id), conflicts=('qr_codes',), job_id=job_id)
+
+
+@admin_bp.route('/qr-codes/<qr_code>.svg', methods=['GET'])
+def admin_qr_code_svg(qr_code):
+    if not is_authorized():
+        abort(403)
+    if not check_qr_code_exists(qr_code):
+        abort(404, description="QR code not found")
+    return Response(QRGenerator.generate_qr_svg(qr_code), mimetype='image/svg+xml')
+
+
+#
+#   JOBS
+#
+
+@admin_bp.route('/jobs/<job_id>', methods=['GET', 'DELETE'])
+def admin_job(job_id):
+    if not is_authorized():
+        abort(403)
+
+    if request.method == 'DELETE' and not cancel_job(job_id):
+        job = get_job(job_id)
+        if not job:
+            abort(404, description="Job not found")
+        return jsonify({"error": f"Job is already {job['status']}", **job}), 409
+
+    job = get_job(job_id)
+    if not job:
+        abort(404, description="Job not found")
+    return jsonify(job)
+
+
+@admin_bp.route('/jobs/<job_id>/download', methods=['GET'])
+def admin_job_download(job_id):
+    if not is_authorized():
+        abort(403)
+
+    job = get_job(job_id)
+    if not job or job['kind'] != 'download-active-qr-codes' or job['status'] != 'succeeded':
+        abort(404, description="No finished export for this job")
+
+    csv_path = export_csv_path(job['id'])
+    if not os.path.isfile(csv_path):
+        abort(404, description="Export file for this job no longer exists")
+
+    return send_file(os.path.abspath(csv_path), mimetype='text/csv', as_attachment=True,
+                     download_name='active_qr_codes.csv')
+
+
+#
+#   PROFILING
+#
+
+@admin_bp.route('/profile', methods=['GET', 'POST', 'DELETE'])
+def admin_profile():
+    if not is_authorized():
+        abort(403)
+
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            sample_rate = float(data.get('sample_rate', 0.0))
+            interval_ms = float(data.get('interval_ms', 5))
+        except (TypeError, ValueError):
+            return jsonify({"error": "sample_rate and interval_ms must be numbers"}), 400
+
+        if not 0.0 <= sample_rate <= 1.0 or not 0 < interval_ms <= MAX_INTERVAL_MS:
+            return jsonify({"error": f"sample_rate must be 0..1 and interval_ms 0..{MAX_INTERVAL_MS}"}), 400
+
+        # An unknown endpoint would enable profiling that never matches a request
+        endpoint = data.get('endpoint')
+        if endpoint is not None and (not isinstance(endpoint, str)
+                                     or endpoint not in current_app.view_functions):
+            return jsonify({"error": "endpoint must be a registered endpoint name, e.g. 'qr.check_qr'"}), 400
+
+        enable_profiling(sample_rate, endpoint, interval_ms)
+        return jsonify(profiling_status())
+
+    if request.method == 'DELETE':
+        disable_profiling()
+        return jsonify(profiling_status())
+
+    output_format = request.args.get('format', 'status')
+    if output_format == 'text':
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in SORT_KEYS:
+            return jsonify({"error": f"sort must be one of: {', '.join(sorted(SORT_KEYS))}"}), 400
+        return Response(get_pstats_text(sort), mimetype='text/plain')
+    if output_format == 'pstats':
+        return Response(get_pstats_dump(), mimetype='application/octet-stream',
+                        headers={"Content-Disposition": "attachment; filename=profile.pstats"})
+    if output_format == 'collapsed':
+        return Response(get_collapsed_stacks(), mimetype='text/plain')
+    return jsonify(profiling_status())
 
 
 #
@@ -83,15 +305,11 @@ def admin_init_teams():
 
     csv_path = os.path.join('static', 'data', 'teams.csv')
 
-    try:
-        result = init_teams_from_csv(csv_path)
-        return jsonify({
-            "message": "Team initialization completed.",
-            **result
-        })
-    except FileNotFoundError:
+    if not os.path.exists(csv_path):
         return jsonify({"error": "CSV file not found"}), 404
 
+    return start_job('init-teams', init_teams_from_csv, csv_path, conflicts=('teams',))
+
 
 @admin_bp.route('/team-scanner-urls', methods=['GET'])
 def get_team_scanner_urls():
@@ -99,7 +317,7 @@ def get_team_scanner_urls():
         abort(403)
 
     with get_db_cursor() as cursor:
-        cursor.execute("SELECT id, team_name FROM teams")
+        cursor.execute(SQL_LIST_TEAMS)
         teams = cursor.fetchall()
 
     # Construct URLs
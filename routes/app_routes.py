@@ -1,4 +1,5 @@
 from flask import Blueprint, render_template, current_app
+from utils.helpers import scanner_settings
 
 app_bp = Blueprint('app_routes', __name__)
 
@@ -15,4 +16,4 @@ def home():
 
 @app_bp.route('/check-visitor')
 def admin_visitor_scanner():
-    return render_template('check-visitor.html')
+    return render_template('check-visitor.html', scanner=scanner_settings())
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, abort
 from database import get_db_cursor
 from database.database import get_team_by_id
+from utils.helpers import scanner_settings
 
 team_bp = Blueprint('team', __name__, url_prefix='/team')
 
@@ -13,4 +14,5 @@ def team_scan_qr(team_id):
     if not team:
         abort(404, description="Team not found")
 
-    return render_template('team_scan_qr.html', team_id=team_id, team_name=team['team_name'])
+    return render_template('team_scan_qr.html', team_id=team_id, team_name=team['team_name'],
+                           scanner=scanner_settings())
@@ -1,15 +1,24 @@
 let html5QrcodeScanner;
 
+let latestScan = 0;
+
 function startScanner() {
   html5QrcodeScanner = new Html5QrcodeScanner("reader", {
-    fps: 10,
-    qrbox: 250,
+    fps: SCANNER.fps,
+    qrbox: SCANNER.qrbox,
   });
   html5QrcodeScanner.render(onScanSuccess, () => {});
 }
 
 function onScanSuccess(decodedText) {
-  html5QrcodeScanner.clear();
+  if (SCANNER.continuous) {
+    // Keep the camera running; ignore the same code held in front of it
+    if (isRepeatScan(decodedText)) return;
+  } else {
+    html5QrcodeScanner.clear();
+  }
+
+  const scanId = ++latestScan;
   document.getElementById(
     "final-result"
   ).innerText = `Scanned: ${decodedText}\nChecking...`;
@@ -23,6 +32,9 @@ function onScanSuccess(decodedText) {
   })
     .then((res) => res.json())
     .then((data) => {
+      // A newer scan already owns the result area
+      if (scanId !== latestScan) return;
+
       const resultWrapper = document.getElementById("final-result");
       const log = document.getElementById("log");
 
@@ -85,6 +97,8 @@ function onScanSuccess(decodedText) {
       resultBox.appendChild(message);
       resultWrapper.appendChild(resultBox);
 
+      if (SCANNER.continuous) return;
+
       const btn = document.createElement("button");
       btn.textContent = "Scan Another";
       btn.onclick = () => location.reload();
@@ -93,6 +107,10 @@ function onScanSuccess(decodedText) {
     })
 
     .catch(() => {
+      // Allow an immediate retry of a code whose check failed
+      recentScans.delete(decodedText);
+      if (scanId !== latestScan) return;
+
       document.getElementById("final-result").innerText = "Error checking visitor.";
     });
 }
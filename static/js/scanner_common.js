@@ -0,0 +1,34 @@
+// Shared scanner options and repeat-scan filtering for the scanner pages.
+// Load after window.SCANNER_CONFIG is set and before the page script.
+
+// Defaults mirror Config.SCANNER_* and are used when the template
+// provides nothing or a ?fps=&qrbox=&dedupe= override is not a positive number
+const SCANNER_DEFAULTS = { continuous: true, fps: 15, qrbox: 250, dedupeMs: 5000 };
+
+function positiveNumber(value, fallback) {
+  const number = Number(value);
+  return Number.isFinite(number) && number > 0 ? number : fallback;
+}
+
+const SCANNER = Object.assign({}, SCANNER_DEFAULTS, window.SCANNER_CONFIG || {});
+{
+  const params = new URLSearchParams(window.location.search);
+  if (params.has("fps")) SCANNER.fps = positiveNumber(params.get("fps"), SCANNER.fps);
+  if (params.has("qrbox")) SCANNER.qrbox = positiveNumber(params.get("qrbox"), SCANNER.qrbox);
+  if (params.has("dedupe")) SCANNER.dedupeMs = positiveNumber(params.get("dedupe"), SCANNER.dedupeMs);
+}
+
+// decodedText -> time of the last accepted decode
+const recentScans = new Map();
+
+function isRepeatScan(decodedText) {
+  const now = Date.now();
+
+  for (const [text, time] of recentScans) {
+    if (now - time > SCANNER.dedupeMs) recentScans.delete(text);
+  }
+
+  if (recentScans.has(decodedText)) return true;
+  recentScans.set(decodedText, now);
+  return false;
+}
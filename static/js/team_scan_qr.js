@@ -1,16 +1,24 @@
 let html5QrcodeScanner;
 
+let latestScan = 0;
+
 function startScanner() {
   html5QrcodeScanner = new Html5QrcodeScanner("reader", {
-    fps: 10,
-    qrbox: 250,
+    fps: SCANNER.fps,
+    qrbox: SCANNER.qrbox,
   });
   html5QrcodeScanner.render(onScanSuccess, onScanFailure);
 }
 
 function onScanSuccess(decodedText, decodedResult) {
-  html5QrcodeScanner.clear();
+  if (SCANNER.continuous) {
+    // Keep the camera running; ignore the same code held in front of it
+    if (isRepeatScan(decodedText)) return;
+  } else {
+    html5QrcodeScanner.clear();
+  }
 
+  const scanId = ++latestScan;
   const resultDiv = document.getElementById("result");
   resultDiv.innerText = `Scanned: ${decodedText}\nChecking...`;
 
@@ -27,16 +35,23 @@ function onScanSuccess(decodedText, decodedResult) {
   })
     .then((response) => response.json())
     .then((data) => {
+      // A newer scan already owns the result area
+      if (scanId !== latestScan) return;
+
       if (data.exists) {
         resultDiv.innerText = `QR Code Accepted ✅.\nThank You for Joining with Us!`;
       } else {
         resultDiv.innerText = `Invalid QR Code. ❌`;
       }
-      addRescanButton();
+      if (!SCANNER.continuous) addRescanButton();
     })
     .catch(() => {
+      // Allow an immediate retry of a code whose check failed
+      recentScans.delete(decodedText);
+      if (scanId !== latestScan) return;
+
       resultDiv.innerText = "Error checking QR code.";
-      addRescanButton();
+      if (!SCANNER.continuous) addRescanButton();
     });
 }
 
@@ -0,0 +1,118 @@
+"""
+Scanning against a database created before the rollup tables existed
+
+Run with: python -m pytest tests  (or python -m unittest discover tests)
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+import uuid
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config.py requires these; any values will do for schema-only tests
+os.environ.setdefault('MIN_VISITS_FOR_STICKER', '13')
+os.environ.setdefault('MAX_QR_CODES_PER_BATCH', '10')
+os.environ.setdefault('DEFAULT_QR_CODE_COUNT', '5')
+
+from flask import Flask  # noqa: E402
+from config import Config  # noqa: E402
+from database import init_db  # noqa: E402
+from routes import register_routes  # noqa: E402
+
+# Schema written by the original init_db, before rollups, jobs and change_log
+OLD_SCHEMA = '''
+    CREATE TABLE teams (
+        id TEXT PRIMARY KEY,
+        team_name TEXT UNIQUE NOT NULL,
+        project_title TEXT,
+        description TEXT,
+        members TEXT,
+        supervisor TEXT,
+        created_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE visitor_visits (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        visitor_qr TEXT NOT NULL,
+        team_name TEXT NOT NULL,
+        visit_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(visitor_qr, team_name)
+    );
+    CREATE TABLE visitors (
+        visitor_qr TEXT PRIMARY KEY,
+        qr_code_image TEXT,
+        generated_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        first_visit TIMESTAMP,
+        last_visit TIMESTAMP,
+        total_visits INTEGER DEFAULT 0,
+        sticker_dispensed BOOLEAN DEFAULT FALSE,
+        sticker_dispensed_time TIMESTAMP,
+        is_active BOOLEAN DEFAULT TRUE
+    );
+    CREATE TABLE qr_codes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        qr_code TEXT UNIQUE NOT NULL,
+        qr_image_base64 TEXT,
+        generated_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        is_printed BOOLEAN DEFAULT FALSE,
+        is_distributed BOOLEAN DEFAULT FALSE,
+        deleted_time TIMESTAMP NULL DEFAULT NULL,
+        notes TEXT
+    );
+    CREATE INDEX idx_visitor_visits_visitor_qr ON visitor_visits(visitor_qr);
+    CREATE INDEX idx_visitor_visits_team_name ON visitor_visits(team_name);
+    CREATE INDEX idx_visitors_total_visits ON visitors(total_visits);
+    CREATE INDEX idx_visitors_sticker_dispensed ON visitors(sticker_dispensed);
+'''
+
+
+class OldSchemaScanTests(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.db_path = os.path.join(tmp_dir.name, 'old.db')
+        self.team_id = str(uuid.uuid4())
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executescript(OLD_SCHEMA)
+            conn.execute("INSERT INTO teams (id, team_name) VALUES (?, 'Team One')", (self.team_id,))
+            conn.execute("INSERT INTO qr_codes (qr_code) VALUES ('QR_0001')")
+            conn.execute('''
+                INSERT INTO visitor_visits (visitor_qr, team_name, visit_time)
+                VALUES ('QR_0001', 'Old Team', '2026-10-18T09:00:00')
+            ''')
+        conn.close()
+
+        patcher = mock.patch.object(Config, 'DB_NAME', self.db_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        app = Flask(__name__)
+        register_routes(app)
+        self.client = app.test_client()
+
+    def test_scan_after_startup_upgrade(self):
+        # What app.py runs at startup
+        init_db()
+
+        response = self.client.post('/api/check-qr', json={'qr_code': 'QR_0001', 'team_id': self.team_id})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['recorded'])
+
+        with sqlite3.connect(self.db_path) as conn:
+            visits = conn.execute('SELECT COUNT(*) FROM visitor_visits').fetchone()[0]
+            rollups = conn.execute(
+                "SELECT SUM(visit_count) FROM team_visit_rollups WHERE granularity = 'hour'"
+            ).fetchone()[0]
+        conn.close()
+
+        self.assertEqual(visits, 2)
+        self.assertEqual(rollups, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
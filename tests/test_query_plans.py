@@ -0,0 +1,45 @@
+"""
+Query-plan regression tests for the hot queries
+
+Run with: python -m pytest tests  (or python -m unittest discover tests)
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config.py requires these; any values will do for schema-only tests
+os.environ.setdefault('MIN_VISITS_FOR_STICKER', '13')
+os.environ.setdefault('MAX_QR_CODES_PER_BATCH', '10')
+os.environ.setdefault('DEFAULT_QR_CODE_COUNT', '5')
+
+from database.query_plans import (  # noqa: E402
+    HOT_QUERIES, check_query_plans, plan_violations, shared_query_names
+)
+
+
+class QueryPlanTests(unittest.TestCase):
+    def test_every_shared_query_is_checked(self):
+        checked = {name for name, _, _ in HOT_QUERIES}
+        self.assertEqual(shared_query_names() - checked, set())
+
+    def test_hot_queries_use_indexes_without_temp_sorts(self):
+        failures = check_query_plans()
+        self.assertEqual(failures, {}, '\n'.join(
+            f"{name}: {problem}" for name, problems in failures.items() for problem in problems))
+
+    def test_full_index_scan_is_a_violation(self):
+        detail = ['SCAN visitors USING COVERING INDEX idx_visitors_total_visits']
+        self.assertEqual(len(plan_violations(detail)), 1)
+        self.assertEqual(plan_violations(detail, partial={'idx_visitors_total_visits'}), [])
+
+    def test_temp_order_by_is_a_violation(self):
+        detail = ['SEARCH visitor_visits USING INDEX idx (visitor_qr=?)',
+                  'USE TEMP B-TREE FOR ORDER BY']
+        self.assertEqual(len(plan_violations(detail)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
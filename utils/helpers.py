@@ -5,7 +5,13 @@ from datetime import datetime
 import os
 import uuid
 import csv
+from config import Config
 from database import get_db_cursor
+from database.database import (
+    refresh_visit_rollups, SQL_CHECK_QR_CODE_EXISTS, SQL_TEAM_NAME_EXISTS, SQL_INSERT_TEAM,
+    SQL_GET_TEAM_NAME_BY_ID, SQL_VISIT_EXISTS, SQL_INSERT_VISIT, SQL_GET_VISITOR_BY_QR,
+    SQL_UPDATE_VISITOR_VISITS, SQL_INSERT_VISITOR
+)
 
 
 def check_qr_code_exists(qr_code: str) -> bool:
@@ -19,23 +25,34 @@ def check_qr_code_exists(qr_code: str) -> bool:
         bool: True if exists and not deleted, False otherwise.
     """
     with get_db_cursor() as cursor:
-        cursor.execute('''
-            SELECT 1
-            FROM qr_codes
-            WHERE qr_code = ? AND deleted_time IS NULL
-            LIMIT 1
-        ''', (qr_code,))
+        cursor.execute(SQL_CHECK_QR_CODE_EXISTS, (qr_code,))
         result = cursor.fetchone()
         return bool(result)
 
 
-def init_teams_from_csv(csv_path: str) -> dict:
+def scanner_settings() -> dict:
+    """
+    Kiosk scanner options passed to the scanner templates.
+
+    Returns:
+        dict: fps, qrbox, dedupe window (ms) and continuous-mode flag.
+    """
+    return {
+        "continuous": Config.SCANNER_CONTINUOUS,
+        "fps": Config.SCANNER_FPS,
+        "qrbox": Config.SCANNER_QRBOX,
+        "dedupeMs": Config.SCANNER_DEDUPE_MS
+    }
+
+
+def init_teams_from_csv(csv_path: str, progress=None) -> dict:
     """
     Initialize the teams table from a CSV file.
     Skips teams that already exist based on team_name.
 
     Args:
         csv_path (str): Path to the CSV file.
+        progress (callable): Optional callback progress(done, total).
 
     Returns:
         dict: Summary with created and skipped counts.
@@ -47,34 +64,37 @@ def init_teams_from_csv(csv_path: str) -> dict:
     skipped = 0
 
     with open(csv_path, newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            team_name = row.get('team_name', '').strip()
+        rows = list(csv.DictReader(csvfile))
 
-            if not team_name:
+    for i, row in enumerate(rows):
+        if progress:
+            progress(i, len(rows))
+
+        team_name = row.get('team_name', '').strip()
+
+        if not team_name:
+            continue
+
+        with get_db_cursor() as cursor:
+            cursor.execute(SQL_TEAM_NAME_EXISTS, (team_name,))
+            exists = cursor.fetchone()
+
+            if exists:
+                skipped += 1
                 continue
 
-            with get_db_cursor() as cursor:
-                cursor.execute(
-                    'SELECT 1 FROM teams WHERE team_name = ?', (team_name,))
-                exists = cursor.fetchone()
-
-                if exists:
-                    skipped += 1
-                    continue
-
-                cursor.execute('''
-                    INSERT INTO teams (id, team_name, project_title, description, members, supervisor)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    str(uuid.uuid4()),
-                    team_name,
-                    row.get('project_title', '').strip(),
-                    row.get('description', '').strip(),
-                    row.get('members', '').strip(),
-                    row.get('supervisor', '').strip()
-                ))
-                created += 1
+            cursor.execute(SQL_INSERT_TEAM, (
+                str(uuid.uuid4()),
+                team_name,
+                row.get('project_title', '').strip(),
+                row.get('description', '').strip(),
+                row.get('members', '').strip(),
+                row.get('supervisor', '').strip()
+            ))
+            created += 1
+
+    if progress:
+        progress(len(rows), len(rows))
 
     return {"teams_created": created, "teams_skipped": skipped}
 
@@ -82,7 +102,7 @@ def init_teams_from_csv(csv_path: str) -> dict:
 def record_visitor_visit(qr_code: str, team_id: str) -> dict:
     """
     Records a visit for a visitor to a team.
-    Updates both visitor_visits and visitors table.
+    Updates visitor_visits, visitors and the team_visit_rollups tables.
 
     Returns:
         dict: {
@@ -107,7 +127,7 @@ def record_visitor_visit(qr_code: str, team_id: str) -> dict:
 
     with get_db_cursor() as cursor:
         # Lookup team name
-        cursor.execute("SELECT team_name FROM teams WHERE id = ?", (team_id,))
+        cursor.execute(SQL_GET_TEAM_NAME_BY_ID, (team_id,))
         team_row = cursor.fetchone()
         if not team_row:
             return {"recorded": False, "error": "Team not found"}
@@ -115,42 +135,31 @@ def record_visitor_visit(qr_code: str, team_id: str) -> dict:
         team_name = team_row["team_name"]
 
         # Check if already visited this team
-        cursor.execute('''
-            SELECT 1 FROM visitor_visits
-            WHERE visitor_qr = ? AND team_name = ?
-        ''', (qr_code, team_name))
+        cursor.execute(SQL_VISIT_EXISTS, (qr_code, team_name))
 
         if cursor.fetchone():
             result['already_visited'] = True
             return result  # No duplicate insert
 
         # Insert into visitor_visits
-        cursor.execute('''
-            INSERT INTO visitor_visits (visitor_qr, team_name, visit_time)
-            VALUES (?, ?, ?)
-        ''', (qr_code, team_name, now))
+        cursor.execute(SQL_INSERT_VISIT, (qr_code, team_name, now))
 
         result['recorded'] = True
 
         # Check if visitor exists
-        cursor.execute(
-            "SELECT * FROM visitors WHERE visitor_qr = ?", (qr_code,))
+        cursor.execute(SQL_GET_VISITOR_BY_QR, (qr_code,))
         visitor_row = cursor.fetchone()
 
         if visitor_row:
             # Update total_visits and last_visit
             total = visitor_row["total_visits"] or 0
-            cursor.execute('''
-                UPDATE visitors
-                SET total_visits = ?, last_visit = ?
-                WHERE visitor_qr = ?
-            ''', (total + 1, now, qr_code))
+            cursor.execute(SQL_UPDATE_VISITOR_VISITS, (total + 1, now, qr_code))
         else:
             # Insert new visitor
-            cursor.execute('''
-                INSERT INTO visitors (visitor_qr, first_visit, last_visit, total_visits)
-                VALUES (?, ?, ?, ?)
-            ''', (qr_code, now, now, 1))
+            cursor.execute(SQL_INSERT_VISITOR, (qr_code, now, now, 1))
             result['visitor_created'] = True
 
+        # Keep the per-team traffic rollups current within the same transaction
+        refresh_visit_rollups(cursor)
+
     return result
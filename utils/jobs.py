@@ -0,0 +1,200 @@
+"""
+In-process background jobs for long-running admin operations
+"""
+
+import json
+import uuid
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from database import get_db_cursor
+from database.database import (
+    SQL_INSERT_JOB, SQL_START_JOB, SQL_FINISH_JOB, SQL_GET_JOB, SQL_FAIL_INTERRUPTED_JOBS
+)
+
+_executor = None
+_registry_lock = threading.Lock()
+_active_jobs = {}  # job_id -> {'conflicts', 'cancel', 'progress', 'total'}
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation has been requested"""
+
+
+class JobConflict(Exception):
+    """Raised when a conflicting job is already queued or running"""
+
+    def __init__(self, job_id):
+        super().__init__(f"Conflicting job {job_id} is already active")
+        self.job_id = job_id
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=Config.JOB_WORKERS, thread_name_prefix='admin-job')
+    return _executor
+
+
+def _progress_reporter(active):
+    """
+    Build the progress(done, total) callback handed to job functions.
+
+    Progress is kept in memory rather than written to the jobs table, so
+    frequent reports never compete with scans for the write lock.
+    """
+    def progress(done, total):
+        if active['cancel'].is_set():
+            raise JobCancelled()
+        active['progress'] = done
+        active['total'] = total
+
+    return progress
+
+
+def _run_job(job_id, func, args, active):
+    if active['cancel'].is_set():
+        _finish(job_id, active, 'cancelled')
+        return
+
+    try:
+        with get_db_cursor() as cursor:
+            cursor.execute(SQL_START_JOB, (_now(), job_id))
+        result = func(*args, progress=_progress_reporter(active))
+        _finish(job_id, active, 'succeeded', result=json.dumps(result))
+    except JobCancelled:
+        _finish(job_id, active, 'cancelled')
+    except Exception as e:
+        _finish(job_id, active, 'failed', error=str(e))
+
+
+def _finish(job_id, active, status, result=None, error=None):
+    try:
+        with get_db_cursor() as cursor:
+            cursor.execute(SQL_FINISH_JOB, (status, active['progress'], active['total'],
+                                            result, error, _now(), job_id))
+    finally:
+        with _registry_lock:
+            _active_jobs.pop(job_id, None)
+
+
+def submit_job(kind: str, func, *args, conflicts=(), job_id=None) -> str:
+    """
+    Queue func(*args, progress=...) on the job worker pool.
+
+    Args:
+        kind (str): Job type recorded in the jobs table.
+        func (callable): Work to run; must accept a progress keyword argument.
+        conflicts (iterable): Resource names this job needs exclusively.
+            The job is rejected while another active job shares any of them.
+        job_id (str): Id for the new job, generated when omitted. Lets the
+            caller derive per-job output paths before queuing.
+
+    Returns:
+        str: The new job id.
+
+    Raises:
+        JobConflict: If a conflicting job is queued or running.
+    """
+    conflicts = frozenset(conflicts)
+    job_id = job_id or str(uuid.uuid4())
+
+    with _registry_lock:
+        for active_id, active in _active_jobs.items():
+            if active['conflicts'] & conflicts:
+                raise JobConflict(active_id)
+
+        with get_db_cursor() as cursor:
+            cursor.execute(SQL_INSERT_JOB, (job_id, kind, _now()))
+
+        active = {
+            'conflicts': conflicts,
+            'cancel': threading.Event(),
+            'progress': 0,
+            'total': None
+        }
+        _active_jobs[job_id] = active
+
+    _get_executor().submit(_run_job, job_id, func, args, active)
+    return job_id
+
+
+def get_job(job_id: str):
+    """
+    Fetch a job's status, progress and decoded result.
+
+    Returns:
+        dict or None: The job row, or None if it does not exist.
+    """
+    with get_db_cursor() as cursor:
+        cursor.execute(SQL_GET_JOB, (job_id,))
+        row = cursor.fetchone()
+
+    if not row:
+        return None
+
+    job = dict(row)
+
+    # Live progress of active jobs is only tracked in memory
+    active = _active_jobs.get(job_id)
+    if active:
+        job['progress'] = active['progress']
+        job['total'] = active['total']
+
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    return job
+
+
+def cancel_job(job_id: str) -> bool:
+    """
+    Request cancellation of a queued or running job. Running jobs stop at
+    their next progress report.
+
+    Returns:
+        bool: True if the job was active and has been flagged for cancellation.
+    """
+    with _registry_lock:
+        active = _active_jobs.get(job_id)
+        if not active:
+            return False
+        active['cancel'].set()
+        return True
+
+
+def run_without_jobs(func, *args):
+    """
+    Run func(*args) only while no job is queued or running, holding off new
+    submissions until it returns (e.g. dropping the tables jobs write to).
+
+    Raises:
+        JobConflict: If a job is active.
+    """
+    with _registry_lock:
+        if _active_jobs:
+            raise JobConflict(next(iter(_active_jobs)))
+        return func(*args)
+
+
+def recover_interrupted_jobs() -> int:
+    """
+    Mark jobs left queued or running by a previous process as failed.
+    Jobs only live in the process that queued them, so none of those rows
+    can still make progress after a restart.
+
+    Returns:
+        int: Number of jobs marked as failed.
+    """
+    try:
+        with get_db_cursor() as cursor:
+            cursor.execute(SQL_FAIL_INTERRUPTED_JOBS, (_now(),))
+            return cursor.rowcount
+    except sqlite3.OperationalError:
+        # Database not initialized yet, so there is no jobs table to recover
+        return 0
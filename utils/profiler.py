@@ -0,0 +1,212 @@
+"""
+On-demand request profiler
+
+While enabled, a sampled fraction of requests (or every request to one
+endpoint) runs under cProfile, and a background thread samples those
+requests' stacks. Results are aggregated in memory as pstats data and
+as collapsed stacks ("a;b;c count") for flamegraph tools. When disabled,
+each request only pays for one dictionary lookup.
+"""
+
+import os
+import sys
+import time
+import random
+import marshal
+import cProfile
+import pstats
+import threading
+from io import StringIO
+from collections import Counter
+from flask import g, request
+
+_settings = {
+    'enabled': False,
+    'sample_rate': 0.0,
+    'endpoint': None,
+    'interval': 0.005
+}
+_lock = threading.Lock()
+
+# Accepted values for get_pstats_text(sort=...)
+SORT_KEYS = frozenset(key.value for key in pstats.SortKey)
+# Upper bound on the sampling interval: disable_profiling() waits for the
+# sampler's current sleep, so a long interval would stall that request
+MAX_INTERVAL_MS = 1000
+_stats = None  # pstats.Stats aggregated over profiled requests
+_stacks = Counter()  # collapsed stack -> sample count
+_profiled_requests = 0
+_active_threads = set()
+_sampler_thread = None
+
+# Never profile the endpoint that reads the results
+_EXCLUDED_ENDPOINTS = {'admin.admin_profile'}
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _sample_stacks():
+    while _settings['enabled']:
+        time.sleep(_settings['interval'])
+
+        with _lock:
+            idents = list(_active_threads)
+        if not idents:
+            continue
+
+        frames = sys._current_frames()
+        samples = []
+        for ident in idents:
+            frame = frames.get(ident)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                samples.append(';'.join(reversed(stack)))
+
+        with _lock:
+            _stacks.update(samples)
+
+
+def _should_profile():
+    if request.endpoint in _EXCLUDED_ENDPOINTS:
+        return False
+    if _settings['endpoint']:
+        return request.endpoint == _settings['endpoint']
+    return random.random() < _settings['sample_rate']
+
+
+def _before_request():
+    if not _settings['enabled'] or not _should_profile():
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already active (one at a time on Python 3.12+)
+        profiler = None
+
+    g._profiler = profiler
+    with _lock:
+        _active_threads.add(threading.get_ident())
+
+
+def _teardown_request(exc):
+    if '_profiler' not in g:
+        return
+
+    global _stats, _profiled_requests
+
+    profiler = g.pop('_profiler')
+    if profiler:
+        profiler.disable()
+
+    with _lock:
+        _active_threads.discard(threading.get_ident())
+        _profiled_requests += 1
+        if profiler:
+            if _stats is None:
+                _stats = pstats.Stats(profiler)
+            else:
+                _stats.add(profiler)
+
+
+def init_profiler(app):
+    """
+    Register the profiling request hooks on the Flask app.
+    """
+    app.before_request(_before_request)
+    app.teardown_request(_teardown_request)
+
+
+def enable_profiling(sample_rate=0.0, endpoint=None, interval_ms=5):
+    """
+    Clear previous results and start profiling matching requests.
+
+    Args:
+        sample_rate (float): Fraction of requests to profile (0..1).
+        endpoint (str): Profile every request to this endpoint instead,
+            e.g. 'qr.check_qr'.
+        interval_ms (float): Stack sampling interval in milliseconds,
+            at most MAX_INTERVAL_MS.
+    """
+    global _stats, _profiled_requests, _sampler_thread
+
+    disable_profiling()
+
+    with _lock:
+        _stats = None
+        _stacks.clear()
+        _profiled_requests = 0
+
+    _settings.update(sample_rate=sample_rate, endpoint=endpoint,
+                     interval=interval_ms / 1000.0, enabled=True)
+
+    _sampler_thread = threading.Thread(
+        target=_sample_stacks, name='profile-sampler', daemon=True)
+    _sampler_thread.start()
+
+
+def disable_profiling():
+    """
+    Stop profiling new requests. Collected results are kept.
+    """
+    _settings['enabled'] = False
+    if _sampler_thread and _sampler_thread.is_alive():
+        _sampler_thread.join()
+
+
+def profiling_status() -> dict:
+    """
+    Current profiling settings and how much data has been collected.
+    """
+    return {
+        'enabled': _settings['enabled'],
+        'sample_rate': _settings['sample_rate'],
+        'endpoint': _settings['endpoint'],
+        'interval_ms': _settings['interval'] * 1000.0,
+        'profiled_requests': _profiled_requests,
+        'stack_samples': sum(_stacks.values())
+    }
+
+
+def get_pstats_text(sort='cumulative', limit=50) -> str:
+    """
+    Human-readable pstats report of the aggregated profile.
+
+    Args:
+        sort (str): One of SORT_KEYS.
+        limit (int): Number of functions to list.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unsupported sort key: {sort}")
+
+    with _lock:
+        if _stats is None:
+            return ''
+        out = StringIO()
+        _stats.stream = out
+        _stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+def get_pstats_dump() -> bytes:
+    """
+    Aggregated profile in the binary format written by pstats dump_stats,
+    loadable with pstats.Stats(path) or snakeviz.
+    """
+    with _lock:
+        return marshal.dumps(_stats.stats if _stats else {})
+
+
+def get_collapsed_stacks() -> str:
+    """
+    Sampled stacks in collapsed format, one "frame;frame;frame count" per line.
+    """
+    with _lock:
+        return ''.join(f"{stack} {count}\n" for stack, count in _stacks.most_common())
@@ -2,6 +2,7 @@
 QR Code Generation Utilities
 """
 
+import os
 import qrcode
 import csv
 import base64
@@ -9,14 +10,13 @@ from datetime import datetime, timezone
 from io import BytesIO
 from config import Config
 from database import get_db_cursor
+from database.database import SQL_INSERT_QR_CODE, SQL_SOFT_DELETE_QR_CODES, SQL_LIST_ACTIVE_QR_CODES
+from utils.qr_renderer import render_png, render_svg
 
 
 class QRGenerator:
     @staticmethod
-    def generate_qr_base64(data):
-        """
-        Generate a base64-encoded QR code image from input data
-        """
+    def _make_qr(data):
         qr = qrcode.QRCode(
             version=Config.QR_CODE_VERSION,
             box_size=Config.QR_CODE_BOX_SIZE,
@@ -24,79 +24,129 @@ class QRGenerator:
         )
         qr.add_data(data)
         qr.make(fit=True)
+        return qr
 
-        img = qr.make_image(fill_color=Config.QR_CODE_FILL_COLOR,
-                            back_color=Config.QR_CODE_BACK_COLOR)
+    @staticmethod
+    def generate_qr_base64(data, image_format=None):
+        """
+        Generate a base64-encoded PNG QR code image from input data.
 
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        return base64.b64encode(buffered.getvalue()).decode('utf-8')
+        This is what qr_codes.qr_image_base64 and the CSV export hold, so
+        it is always PNG. image_format only picks the PNG renderer and
+        defaults to Config.QR_CODE_FORMAT:
+        - 'png': 1-bit palette PNG written directly from the module matrix
+        - 'pil': full PIL image encoded as PNG (original renderer)
+        """
+        image_format = image_format or Config.QR_CODE_FORMAT
+        qr = QRGenerator._make_qr(data)
+
+        if image_format == 'png':
+            image_bytes = render_png(qr.get_matrix(), Config.QR_CODE_BOX_SIZE,
+                                     Config.QR_CODE_FILL_COLOR, Config.QR_CODE_BACK_COLOR)
+        elif image_format == 'pil':
+            img = qr.make_image(fill_color=Config.QR_CODE_FILL_COLOR,
+                                back_color=Config.QR_CODE_BACK_COLOR)
+            buffered = BytesIO()
+            img.save(buffered, format="PNG")
+            image_bytes = buffered.getvalue()
+        else:
+            raise ValueError(f"Unsupported QR code PNG renderer: {image_format}")
+
+        return base64.b64encode(image_bytes).decode('utf-8')
 
     @staticmethod
-    def init_qr_codes():
+    def generate_qr_svg(data):
         """
-        Populate the qr_codes table with generated QR code data
+        Render a QR code as an SVG document on demand (never stored)
+        """
+        qr = QRGenerator._make_qr(data)
+        return render_svg(qr.get_matrix(), Config.QR_CODE_BOX_SIZE,
+                          Config.QR_CODE_FILL_COLOR, Config.QR_CODE_BACK_COLOR)
+
+    @staticmethod
+    def _render_qr_codes(progress=None):
+        """
+        Render every QR code image up front, outside any database
+        transaction, so scans are not blocked while images are generated.
         """
         default_count = Config.DEFAULT_QR_CODE_COUNT
+        rows = []
 
-        with get_db_cursor() as cursor:
-            for i in range(default_count):
-                qr_code_text = f"QR_{i + 1:04}"
-                qr_base64 = QRGenerator.generate_qr_base64(qr_code_text)
+        for i in range(default_count):
+            qr_code_text = f"QR_{i + 1:04}"
+            rows.append((qr_code_text, QRGenerator.generate_qr_base64(qr_code_text)))
+
+            if progress:
+                progress(i + 1, default_count)
 
-                cursor.execute('''
-                    INSERT INTO qr_codes (qr_code, qr_image_base64)
-                    VALUES (?, ?)
-                ''', (qr_code_text, qr_base64))
+        return rows
 
     @staticmethod
-    def reset_qr_codes():
+    def _insert_qr_codes(cursor, rows):
+        cursor.executemany(SQL_INSERT_QR_CODE, rows)
+
+        return {"qr_codes_created": len(rows)}
+
+    @staticmethod
+    def init_qr_codes(progress=None):
+        """
+        Populate the qr_codes table with generated QR code data
+
+        :param progress: Optional callback progress(done, total)
+        :return: Summary with the number of QR codes created
+        """
+        rows = QRGenerator._render_qr_codes(progress)
+
+        with get_db_cursor() as cursor:
+            return QRGenerator._insert_qr_codes(cursor, rows)
+
+    @staticmethod
+    def reset_qr_codes(progress=None):
         """
         Soft delete all existing QR codes by:
         - Setting deleted_time to now
         - Prefixing qr_code with 'DEL_' to avoid naming conflicts
 
-        Then insert new QR codes starting fresh.
+        Then insert new QR codes starting fresh. Images are rendered first;
+        the soft delete and inserts then share one short transaction, so an
+        interrupted reset leaves the old codes active.
+
+        :param progress: Optional callback progress(done, total)
+        :return: Summary with the number of QR codes created
         """
+        rows = QRGenerator._render_qr_codes(progress)
         now = datetime.now(timezone.utc).isoformat()
 
         with get_db_cursor() as cursor:
             # Prefix qr_code and set deleted_time only for active (non-deleted) rows
-            cursor.execute('''
-                UPDATE qr_codes
-                SET 
-                    qr_code = 'DEL_' || qr_code,
-                    deleted_time = ?
-                WHERE deleted_time IS NULL
-            ''', (now,))
+            cursor.execute(SQL_SOFT_DELETE_QR_CODES, (now,))
 
-        QRGenerator.init_qr_codes()
+            return QRGenerator._insert_qr_codes(cursor, rows)
 
     @staticmethod
-    def export_active_qr_codes_to_csv(csv_path='active_qr_codes.csv'):
+    def export_active_qr_codes_to_csv(csv_path='active_qr_codes.csv', progress=None):
         """
         Retrieve all non-deleted QR codes and save them to a CSV file.
 
         :param csv_path: Path to save the CSV file
+        :param progress: Optional callback progress(done, total)
         :return: Path to the generated CSV file
         """
         with get_db_cursor() as cursor:
-            cursor.execute('''
-                SELECT qr_code, qr_image_base64, generated_time, is_printed, is_distributed, notes
-                FROM qr_codes
-                WHERE deleted_time IS NULL
-                ORDER BY id
-            ''')
+            cursor.execute(SQL_LIST_ACTIVE_QR_CODES)
             rows = cursor.fetchall()
 
         # Define CSV headers matching selected columns
         headers = ['qr_code', 'qr_image_base64', 'generated_time',
                    'is_printed', 'is_distributed', 'notes']
 
+        os.makedirs(os.path.dirname(csv_path) or '.', exist_ok=True)
         with open(csv_path, mode='w', newline='', encoding='utf-8') as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow(headers)
-            for row in rows:
+            for i, row in enumerate(rows):
                 writer.writerow([row[h] for h in headers])
+                if progress:
+                    progress(i + 1, len(rows))
 
         return csv_path
@@ -0,0 +1,83 @@
+"""
+Direct QR code renderers that skip PIL rasterization
+
+Both renderers take the module matrix from qrcode.QRCode.get_matrix()
+(border included, True for dark modules).
+"""
+
+import struct
+import zlib
+from PIL import ImageColor
+
+
+def _png_chunk(chunk_type, data):
+    chunk = chunk_type + data
+    return struct.pack('>I', len(data)) + chunk + struct.pack('>I', zlib.crc32(chunk) & 0xffffffff)
+
+
+def render_png(matrix, box_size, fill_color='black', back_color='white'):
+    """
+    Encode the module matrix as a 1-bit palette PNG.
+
+    Each module row is packed once and repeated box_size times, so the
+    cost grows with the number of modules rather than the number of pixels.
+
+    Returns:
+        bytes: PNG file contents.
+    """
+    size = len(matrix) * box_size
+    dark_run = '1' * box_size
+    light_run = '0' * box_size
+    pad = -size % 8
+    row_bytes = (size + pad) // 8
+
+    rows = []
+    for modules in matrix:
+        bits = ''.join(dark_run if dark else light_run for dark in modules) + '0' * pad
+        # Filter type 0 (None) followed by the packed scanline
+        rows.append(b'\x00' + int(bits, 2).to_bytes(row_bytes, 'big'))
+
+    raw = b''.join(row * box_size for row in rows)
+
+    header = struct.pack('>IIBBBBB', size, size, 1, 3, 0, 0, 0)
+    palette = bytes(ImageColor.getrgb(back_color)[:3] + ImageColor.getrgb(fill_color)[:3])
+
+    return b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        _png_chunk(b'IHDR', header),
+        _png_chunk(b'PLTE', palette),
+        _png_chunk(b'IDAT', zlib.compress(raw, 9)),
+        _png_chunk(b'IEND', b''),
+    ])
+
+
+def render_svg(matrix, box_size, fill_color='black', back_color='white'):
+    """
+    Encode the module matrix as an SVG with one path, merging horizontal
+    runs of dark modules into single rectangles.
+
+    Returns:
+        bytes: UTF-8 encoded SVG document.
+    """
+    count = len(matrix)
+    size = count * box_size
+
+    path = []
+    for y, modules in enumerate(matrix):
+        x = 0
+        while x < count:
+            if not modules[x]:
+                x += 1
+                continue
+            start = x
+            while x < count and modules[x]:
+                x += 1
+            path.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+        f'viewBox="0 0 {count} {count}" shape-rendering="crispEdges">'
+        f'<rect width="{count}" height="{count}" fill="{back_color}"/>'
+        f'<path d="{"".join(path)}" fill="{fill_color}"/>'
+        f'</svg>'
+    ).encode('utf-8')